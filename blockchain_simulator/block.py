@@ -1,11 +1,31 @@
 from blockchain_simulator.blueprint import NodeBase, BlockBase
 from typing import Set, Optional, Generator
-import hashlib
+import hashlib, struct
+
+HASH_ATTEMPTS_PER_STEP = 1000 # Nonces tried between yields back to the simulation
+_POW_HEADER = struct.Struct("<QQ") # (block_id, nonce) as hashed by proof-of-work
+
+def _pow_target(difficulty: int) -> bytes:
+    """Returns the largest digest with `difficulty` leading zero hex digits. Valid hashes compare <= to it."""
+    return ((1 << (256 - 4 * difficulty)) - 1).to_bytes(32, "big")
+
+def _search_nonce(block_id: int, start: int, count: int, target: bytes) -> Optional[int]:
+    """Tries nonces in [start, start + count) and returns the first whose hash meets the target, or None."""
+    sha256 = hashlib.sha256
+    pack = _POW_HEADER.pack
+    for nonce in range(start, start + count):
+        if sha256(pack(block_id, nonce)).digest() <= target:
+            return nonce
+    return None
+
 class PoWBlock(BlockBase):
+    __slots__ = ("nonce", "weight", "pow_zeros")
+    
     def __init__(self):
         super().__init__()
         self.nonce: int
         self.weight: int
+        self.pow_zeros: Optional[int] = None # Leading zero hex digits of the hash, set on first verification
 
     @staticmethod
     def create_block(parent: BlockBase, time_stamp: float, miner: NodeBase) -> Generator[None, None, BlockBase]:
@@ -17,10 +37,10 @@ class PoWBlock(BlockBase):
         block.weight = 1
         block.children_ids = set()
         block.nonce = 0
-        block.block_id = block.generate_block_id()
+        block.block_id = miner.network.next_block_id()
 
         if miner.get_mining_difficulty() > 0:
-            yield miner.get_env().process(block.mine(miner, miner.get_mining_difficulty()))
+            yield from block.mine(miner, miner.get_mining_difficulty())
         return block
     
     @staticmethod
@@ -39,41 +59,36 @@ class PoWBlock(BlockBase):
     def clone(self) -> BlockBase:
         """Clone the block. Should be overridden by subclasses to copy specific attributes. Meant for sending copy of blocks to other nodes instead of the original block."""
         copy = self.__class__.__new__(self.__class__)
-        for key, value in self.__dict__.items():
-            if key == "weight":
-                setattr(copy, key, 1)
-            elif key == "children_ids":
-                setattr(copy, key, set())
-            else:
-                setattr(copy, key, value)
+        for cls in self.__class__.__mro__:
+            for key in getattr(cls, "__slots__", ()):
+                if hasattr(self, key):
+                    setattr(copy, key, getattr(self, key))
+        if hasattr(self, "__dict__"): # Subclasses that don't declare __slots__
+            copy.__dict__.update(self.__dict__)
+        copy.weight = 1
+        copy.children_ids = set()
+        copy.best_child_id = None
         return copy
         
     def mine(self, node: 'NodeBase', difficulty: int = 4):
         """Proof-of-work mining algorithm."""
         self.nonce = 0
-        hash_attempts = 0
-        target_prefix = "0" * difficulty
+        target = _pow_target(difficulty)
         while node.get_is_mining():
-            hash = hashlib.sha256(f"{self.block_id}{self.nonce}".encode()).hexdigest()
-            hash_attempts += 1
-            if hash.startswith(target_prefix):
+            nonce = _search_nonce(self.block_id, self.nonce, HASH_ATTEMPTS_PER_STEP, target)
+            if nonce is not None:
+                self.nonce = nonce
                 break
-            self.nonce += 1
-            if hash_attempts % 1000 == 0:
-                yield node.get_env().timeout(0.01)
+            self.nonce += HASH_ATTEMPTS_PER_STEP
+            yield node.get_env().timeout(0.01)
                 
     def verify_block(self, owner: NodeBase) -> bool:
         """ Abstract method to verify block validity"""
-        if self.nonce is None:
-            return False
-        
-        hash = hashlib.sha256(f"{self.block_id}{self.nonce}".encode()).hexdigest()
-        return hash.startswith("0" * owner.get_mining_difficulty())
-    
-    def generate_block_id(self) -> int:
-        """Generates a unique block ID using SHA-256."""
-        block_data = f"{self.get_parent_id()}-{self.miner_id}-{self.timestamp}"
-        return int(hashlib.sha256(block_data.encode()).hexdigest(), 16) % (10**10)  # Mod to keep ID readable
+        # Hash once; every peer that receives the block verifies it
+        if self.pow_zeros is None:
+            hash = hashlib.sha256(_POW_HEADER.pack(self.block_id, self.nonce)).digest()
+            self.pow_zeros = (256 - int.from_bytes(hash, "big").bit_length()) // 4
+        return self.pow_zeros >= owner.get_mining_difficulty()
     
     def get_weight(self) -> int:
         """Returns the weight of the block."""
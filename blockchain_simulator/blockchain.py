@@ -9,7 +9,7 @@ class Blockchain(BlockchainBase):
         }
         
     def add_block(self, block: BlockBase, node: NodeBase) -> bool:
-        if not self.authorize_block(block, node):
+        if self.contains_block(block.get_block_id()) or not self.authorize_block(block, node):
             return False
         
         parent = self.get_block(block.get_parent_id())
@@ -1,15 +1,23 @@
 from abc import ABC, abstractmethod
-from typing import List, Type, Dict, Set, Optional, Generator
+from typing import List, Type, Dict, Set, Optional, Generator, ValuesView, Iterable
 import simpy, random
-from blockchain_simulator.manim_animator import AnimationLogger
+import numpy as np
+from collections import deque
+from blockchain_simulator.animation_logger import AnimationLogger
+
+MINING_DELAY_BATCH = 256 # Pause lengths between mining attempts drawn per refill
+
 # Griffin
 class BlockBase(ABC):
+    __slots__ = ("block_id", "parent_id", "children_ids", "miner_id", "timestamp", "best_child_id") # No per-instance __dict__
+    
     def __init__(self):
         self.block_id: int
         self.parent_id: int
         self.children_ids: Set[int]
         self.miner_id: int
         self.timestamp: float
+        self.best_child_id: Optional[int] = None # Child on the heaviest path
         
     @staticmethod
     @abstractmethod
@@ -48,6 +56,14 @@ class BlockBase(ABC):
     def add_child(self, child_id: int) -> None:
         """Adds a child block. Makes sure no duplicate children"""
         self.children_ids.add(child_id)
+    
+    def get_best_child_id(self) -> Optional[int]:
+        """Returns the id of the child on the preferred chain, or None if the block is a tip"""
+        return self.best_child_id
+    
+    def set_best_child_id(self, child_id: Optional[int]) -> None:
+        """Sets the child on the preferred chain"""
+        self.best_child_id = child_id
 
     def set_parent(self, parent_id: int) -> None:
         """Sets the parent block"""
@@ -127,7 +143,7 @@ class ConsensusProtocolBase(ABC):
     
     @abstractmethod
     def update_main_chain(self, blockchain: 'BlockchainBase') -> None:
-        """Updates the main chain of a node by calling the update_head method of the blockchain and starting from the get_genesis method."""
+        """Updates the main chain of a node by calling the update_head method of the blockchain. The walk may start from the current head, which is only correct if every block is added through execute_consensus."""
         raise NotImplementedError("update_main_chain method is not implemented")
 
 # Siddarth
@@ -149,6 +165,9 @@ class BroadcastProtocolBase(ABC):
 
 # Jacob    
 class NodeBase(ABC):
+    __slots__ = ("env", "node_id", "network", "consensus", "blockchain", "broadcast_protocol", "mining_difficulty", "peers", "is_mining",
+                 "recent_senders", "pending_blocks", "proposed_blocks", "proposal_event", "rng", "mining_delays", "block_class")
+    
     @abstractmethod
     def __init__(self,
                  env: simpy.Environment,
@@ -178,21 +197,24 @@ class NodeBase(ABC):
         self.blockchain = blockchain_class(block_class)
         self.broadcast_protocol = broadcast_protocol_class()
         self.mining_difficulty = mining_difficulty
-        self.peers: Set['NodeBase'] = set()
+        self.peers: Dict[int, 'NodeBase'] = {} # Maps node_id to peer
         self.is_mining = False
-        self.recent_senders: Set[tuple[int, int]] = set()  # Set of (block_id, sender_id) tuples for recent senders. Needs to be reset periodically
-        self.pending_blocks: Dict[int, Set[BlockBase]] = {}
-        self.proposed_blocks: List[BlockBase] = [] # Blocks that have been proposed by this node, either through mining or receiving
+        self.recent_senders: Dict[int, Set[int]] = {}  # block_id -> ids of peers that sent us that block
+        self.pending_blocks: Dict[int, Dict[int, BlockBase]] = {} # parent_id -> {block_id: block} waiting for that parent
+        self.proposed_blocks: deque[BlockBase] = deque() # Blocks that have been proposed by this node, either through mining or receiving
+        self.proposal_event: Optional[simpy.Event] = None # Wakes an idle step process
+        self.rng = np.random.default_rng(random.getrandbits(64)) # Seeded from random so random.seed() reproduces runs
+        self.mining_delays: List[float] = [] # Pre-sampled pauses between mining attempts
         self.env.process(self.step()) # Start the node process
         self.block_class: Type[BlockBase] = block_class
     
-    def get_peers(self) -> Set['NodeBase']:
+    def get_peers(self) -> ValuesView['NodeBase']:
         """Returns the peers of the node."""
-        return self.peers
+        return self.peers.values()
     
     def add_peer(self, peer: 'NodeBase') -> None:
         """Adds a peer to the node."""
-        self.peers.add(peer)
+        self.peers[peer.node_id] = peer
     
     @abstractmethod
     def mine_block(self) -> None:
@@ -211,16 +233,24 @@ class NodeBase(ABC):
     def mining_loop(self):
         """The mining loop for the node. Should call mine_block and then wait for a delay before mining again."""
         while self.is_mining:
-            yield self.env.process(self.mine_block())
-            yield self.env.timeout(random.uniform(0.1, 0.5))
+            yield from self.mine_block()
+            yield self.env.timeout(self.next_mining_delay())
+    
+    def next_mining_delay(self) -> float:
+        """Returns how long to pause before the next mining attempt. Draws are sampled in batches."""
+        if not self.mining_delays:
+            self.mining_delays = self.rng.uniform(0.1, 0.5, MINING_DELAY_BATCH).tolist()
+        return self.mining_delays.pop()
             
-    def get_proposed_blocks(self) -> List[BlockBase]:
+    def get_proposed_blocks(self) -> deque[BlockBase]:
         """Returns the proposed blocks of the node."""
         return self.proposed_blocks
 
     def add_proposed_block(self, block: BlockBase) -> None:
         """Adds a block to the proposed blocks of the node."""
         self.proposed_blocks.append(block)
+        if self.proposal_event is not None and not self.proposal_event.triggered:
+            self.proposal_event.succeed()
     
     @abstractmethod
     def step(self) -> None:
@@ -237,15 +267,17 @@ class NodeBase(ABC):
     
     def add_to_pending(self, block: BlockBase) -> None:
         """Adds a block to the pending blocks of the node. Meant for when parent isn't on chain yet"""
-        if block.get_parent_id() not in self.pending_blocks:
-            self.pending_blocks[block.get_parent_id()] = set()
-        self.pending_blocks[block.get_parent_id()].add(block)
+        self.pending_blocks.setdefault(block.get_parent_id(), {})[block.get_block_id()] = block
     
-    def get_pending_for_parent(self, parent_id: int) -> Set[BlockBase]:
+    def get_pending_for_parent(self, parent_id: int) -> Iterable[BlockBase]:
         """Returns the pending blocks for a parent block."""
-        if parent_id in self.pending_blocks:
-            return self.pending_blocks[parent_id]
-        return set()
+        pending = self.pending_blocks.get(parent_id)
+        return pending.values() if pending else ()
+    
+    def pop_pending_for_parent(self, parent_id: int) -> Iterable[BlockBase]:
+        """Removes and returns the pending blocks for a parent block in one lookup."""
+        pending = self.pending_blocks.pop(parent_id, None)
+        return pending.values() if pending else ()
     
     def get_env(self) -> simpy.Environment:
         """Returns the simulation environment."""
@@ -285,6 +317,8 @@ class NetworkTopologyBase(ABC):
 
 # Jacob
 class BlockchainSimulatorBase(ABC):
+    last_block_id: int = 0
+    
     @abstractmethod
     def __init__(self, 
                  network_topology_class: Type[NetworkTopologyBase], 
@@ -363,7 +397,21 @@ class BlockchainSimulatorBase(ABC):
         """Returns the drop rate for messages."""
         return self.drop_rate
     
+    def next_block_id(self) -> int:
+        """Returns a new block ID. IDs are sequential, so they never collide."""
+        self.last_block_id += 1
+        return self.last_block_id
+    
     def send_block_to_node(self, sender: NodeBase, recipient: NodeBase, block: BlockBase):
         """Sends a block to a node meant to used by broadcast protocol"""
         raise NotImplementedError("send_block_to_node method is not implemented")
+    
+    def deliver_block(self, sender: NodeBase, recipient: NodeBase, block: BlockBase) -> None:
+        """Schedules sending a block to a node without waiting on it. Subclasses can override to avoid spawning a process per message."""
+        self.env.process(self.send_block_to_node(sender, recipient, block))
+    
+    def deliver_block_to_nodes(self, sender: NodeBase, recipients: List[NodeBase], block: BlockBase) -> None:
+        """Schedules sending a block to several nodes. Subclasses can override to batch the deliveries."""
+        for recipient in recipients:
+            self.deliver_block(sender, recipient, block)
     
\ No newline at end of file
@@ -1,6 +1,7 @@
 from blockchain_simulator.blueprint import BlockchainBase, BlockBase, NodeBase, ConsensusProtocolBase, BroadcastProtocolBase, BlockchainSimulatorBase
 from typing import Set, Dict
-import random
+from collections import deque
+import itertools
 
 class GossipProtocol(BroadcastProtocolBase):
     def __init__(self):
@@ -8,59 +9,78 @@ class GossipProtocol(BroadcastProtocolBase):
         
     def broadcast_block(self, node: NodeBase, block: BlockBase):
         targets = []
-        for peer in node.get_peers():
-            if (block.block_id, peer.node_id) in node.recent_senders:
+        recipients = []
+        block_id = block.block_id
+        senders = node.recent_senders.pop(block_id, ()) # Peers that sent us this block
+        drop_rate = node.network.get_drop_rate()
+        animator = node.network.animator
+        peers = node.get_peers()
+        # Roll 1-100 for each peer
+        drops = (node.rng.integers(1, 101, len(peers)) <= drop_rate).tolist() if drop_rate > 0 else itertools.repeat(False)
+        for peer, is_dropped in zip(peers, drops):
+            if peer.node_id in senders:
                 continue
-            is_dropped = random.randint(1, 100) <= node.network.get_drop_rate()
-            targets.append((peer.node_id, is_dropped, peer.blockchain.contains_block(block.block_id)))
+            if animator.enabled:
+                targets.append((peer.node_id, is_dropped, peer.blockchain.contains_block(block_id)))
             if not is_dropped:
-                node.get_env().process(node.network.send_block_to_node(node, peer, block)) 
+                recipients.append(peer)
             else:
                 # node.network.metrics["dropped_blocks"] += 1
                 pass
+        node.network.deliver_block_to_nodes(node, recipients, block)
         
         #  One log for all peers
-        node.network.animator.log_event(f"Node {node.get_node_id()} broadcasting block {block} to {targets}", timestamp=node.env.now)
+        if animator.enabled:
+            animator.log_event(f"Node {node.get_node_id()} broadcasting block {block} to {targets}", timestamp=node.env.now)
     
     def process_block(self, recipient: NodeBase, sender: NodeBase, block: BlockBase):
         """Process a received block or forward if part of a request response."""
-        recipient.recent_senders.add((block.get_block_id(), sender.get_node_id()))
-        
-        # If this block is a response to a prior request, forward it
-        origin = recipient.network.get_request_origin(block.get_block_id(), recipient)
+        block_id = block.get_block_id()
+        network = recipient.network
+        blockchain = recipient.blockchain
+        # If this block is a response to a prior request, forward it once
+        origin = network.pop_request_origin(block_id, recipient)
         if origin:
-            recipient.get_env().process(recipient.network.send_block_to_node(recipient, origin, block))
+            network.deliver_block(recipient, origin, block)
         
         # If the block is already in the chain, log for animation
-        if recipient.blockchain.contains_block(block.get_block_id()):
-            recipient.network.animator.log_event(f"Node {recipient.get_node_id()} received duplicate block {block.get_block_id()}",timestamp=recipient.get_env().now)
+        if blockchain.contains_block(block_id):
+            if network.animator.enabled:
+                network.animator.log_event(f"Node {recipient.get_node_id()} received duplicate block {block_id}",timestamp=recipient.get_env().now)
             return
+        recipient.recent_senders.setdefault(block_id, set()).add(sender.get_node_id())
         
         # If the block is new, process it
-        if recipient.blockchain.is_parent_missing(block):
+        if blockchain.is_parent_missing(block):
             # print("\033[91m PARENT MISSING. REQUESTING...\033[0m")
-            recipient.get_env().process(self._request_missing_block(recipient, block.get_parent_id(), 3, recipient.get_node_id()))
+            recipient.add_to_pending(block)
+            self._request_missing_block(recipient, block.get_parent_id(), 3, recipient.get_node_id())
             return
         
         # Propose the block to the consensus protocol
         recipient.get_consensus_protocol().propose_block(recipient, block)
         
     def _request_missing_block(self, requester: NodeBase, block_id: int, ttl: int, origin_id: int):
-        if ttl <= 0 or self._request_already_seen(block_id, requester.get_node_id()):
-            return
+        """Asks peers for a missing block, passing the request on breadth-first for up to ttl hops."""
+        network = requester.network
+        requests = deque([(requester, ttl)])
+        while requests:
+            requester, ttl = requests.popleft()
+            if ttl <= 0 or self._request_already_seen(block_id, requester.get_node_id()):
+                continue
 
-        # Log the request
-        requester.network.animator.log_event(f"Node {requester.get_node_id()} requesting block {block_id} with TTL={ttl}",timestamp=requester.env.now)
+            # Log the request
+            if network.animator.enabled:
+                network.animator.log_event(f"Node {requester.get_node_id()} requesting block {block_id} with TTL={ttl}",timestamp=requester.env.now)
 
-        for peer in requester.get_peers():
-            requester.network.register_request_origin(block_id, peer, requester)
+            for peer in requester.get_peers():
+                network.register_request_origin(block_id, peer, requester)
 
-            if peer.blockchain.contains_block(block_id):
-                block = peer.blockchain.get_block(block_id).clone()
-                requester.get_env().process(requester.network.send_block_to_node(peer, requester, block))
-            else:
-                peer.get_env().process(self._request_missing_block(peer, block_id, ttl - 1, origin_id))
-        yield requester.get_env().timeout(0)
+                if peer.blockchain.contains_block(block_id):
+                    block = peer.blockchain.get_block(block_id).clone()
+                    network.deliver_block(peer, requester, block)
+                else:
+                    requests.append((peer, ttl - 1))
         
     def _request_already_seen(self, block_id: int, node_id: int) -> bool:
         key = (block_id, node_id)
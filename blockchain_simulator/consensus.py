@@ -1,6 +1,6 @@
 from blockchain_simulator.blueprint import BlockchainBase, BlockBase, NodeBase, ConsensusProtocolBase, BroadcastProtocolBase, BlockchainSimulatorBase
 from blockchain_simulator.block import PoWBlock
-from typing import Set, List, Dict, Any
+from typing import Set, List, Dict, Any, Optional
 
 class GHOSTProtocol(ConsensusProtocolBase):        
     def __init__(self):
@@ -9,50 +9,67 @@ class GHOSTProtocol(ConsensusProtocolBase):
         }
 
     def update_main_chain(self, blockchain: BlockchainBase, node_id: int):
-        head = blockchain.get_genesis()
+        """Walks down from the current head. Assumes every block went through execute_consensus, which keeps the head on the heaviest path."""
+        self._advance_head(blockchain, blockchain.get_current_head())
+    
+    def _advance_head(self, blockchain: BlockchainBase, start: BlockBase):
+        """Follows the cached heaviest child from start down to a tip and makes it the head."""
         previous_head = blockchain.get_current_head().block_id
-        while len(head.get_children_ids()) > 0:
-            children_ids: Set[PoWBlock] = head.get_children_ids()
-            children: List[PoWBlock] = [blockchain.get_block(child_id) for child_id in children_ids]
-            head = max(children, key=lambda b: (b.get_weight(), -b.get_block_id()))
+        head = start
+        while head.get_best_child_id() is not None:
+            head = blockchain.get_block(head.get_best_child_id())
         blockchain.update_head(head)
-        if previous_head != blockchain.get_current_head().get_parent_id():
+        if previous_head != head.get_parent_id():
             self.metrics["fork_resolutions"] += 1
     
     def propose_block(self, node: NodeBase, block: PoWBlock):
+        if node.blockchain.contains_block(block.get_block_id()):
+            return
         if node.blockchain.authorize_block(block, node):
             node.add_proposed_block(block)
             
     def execute_consensus(self, node: NodeBase):
-        if len(node.get_proposed_blocks()) == 0:
-            return
-        
-        for block in node.get_proposed_blocks():
+        proposed_blocks = node.get_proposed_blocks()
+        while proposed_blocks:
+            block = proposed_blocks.popleft()
+            if node.blockchain.contains_block(block.get_block_id()):
+                continue
             block_clone: PoWBlock = block.clone()
             if node.blockchain.add_block(block_clone, node):
-                self._update_weights(block_clone, node)
-                self.update_main_chain(node.blockchain, node.node_id)               
+                # Walk from where the heaviest path changed, if it did
+                path_change = self._update_weights(block_clone, node)
+                self._advance_head(node.blockchain, path_change or node.blockchain.get_current_head())
                 self._process_pending_blocks(node, block.get_block_id())
                 node.broadcast_protocol.broadcast_block(node, block)
-        # Update the main chain
-        node.get_proposed_blocks().clear()
     
-    def _update_weights(self, block: PoWBlock, node: NodeBase):
-        weight = 1
-        children = block.get_children_ids()
-        for child_id in children:
-            child: PoWBlock = node.blockchain.get_block(child_id)
-            assert(isinstance(child_id, int))
-            weight += child.get_weight()
-        block.set_weight(weight)
-        
-        if block.get_block_id() == node.blockchain.get_genesis().get_block_id(): # Genesis block
-            return
-        parent_id = block.get_parent_id()
-        parent: PoWBlock = node.blockchain.get_block(parent_id)
-        self._update_weights(parent, node)
+    def _update_weights(self, block: PoWBlock, node: NodeBase) -> Optional[PoWBlock]:
+        """Propagates a newly added leaf towards genesis. Each ancestor's subtree gains exactly one block.
+        Returns the highest ancestor on the heaviest path whose best child changed, or None if the path is unchanged."""
+        blockchain = node.blockchain
+        child = block
+        parent: PoWBlock = blockchain.get_block(block.get_parent_id())
+        path_change: Optional[PoWBlock] = None
+        while parent is not None:
+            parent.set_weight(parent.get_weight() + 1)
+            if self._update_best_child(parent, child, node):
+                path_change = parent
+            elif parent.get_best_child_id() != child.get_block_id():
+                path_change = None
+            child = parent
+            parent = blockchain.get_block(parent.get_parent_id())
+        return path_change
+    
+    def _update_best_child(self, parent: PoWBlock, child: PoWBlock, node: NodeBase) -> bool:
+        """Points the parent at the child if the child is now its heaviest, ties broken by the lowest block id. Returns whether the pointer changed."""
+        best_id = parent.get_best_child_id()
+        if best_id == child.get_block_id():
+            return False
+        best: PoWBlock = node.blockchain.get_block(best_id) if best_id is not None else None
+        if best is None or (child.get_weight(), -child.get_block_id()) > (best.get_weight(), -best.get_block_id()):
+            parent.set_best_child_id(child.get_block_id())
+            return True
+        return False
                 
     def _process_pending_blocks(self, node: NodeBase, parent_id: int):
-        for block in node.get_pending_for_parent(parent_id):
-            node.add_proposed_block(block)
-        node.get_pending_for_parent(parent_id).clear()
\ No newline at end of file
+        for block in node.pop_pending_for_parent(parent_id):
+            node.add_proposed_block(block)
\ No newline at end of file
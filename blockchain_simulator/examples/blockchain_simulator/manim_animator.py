@@ -3,31 +3,9 @@ from typing import List, Dict, Tuple, Any
 import json, re
 import numpy as np
 from tqdm import tqdm
+from blockchain_simulator.animation_logger import AnimationLogger
 
 
-class AnimationLogger:
-    def __init__(self):
-        self.events: List[Tuple[float, str]] = []
-        self.num_nodes: int = 0
-        self.peers: Dict[int, List[int]] = {}
-
-    def log_event(self, message: str, timestamp: float):
-        self.events.append((timestamp, message))
-
-    def set_num_nodes(self, num_nodes: int):
-        self.num_nodes = num_nodes
-
-    def set_peers(self, peers: Dict[int, List[int]]):
-        self.peers = peers
-
-    def save(self, filepath: str = "animation_events.json"):
-        with open(filepath, "w") as f:
-            json.dump({
-                "num_nodes": self.num_nodes,
-                "events": self.events,
-                "peers": self.peers,
-            }, f, indent=2)
-
 # ======================
 # Node + Edge Classes
 # ======================
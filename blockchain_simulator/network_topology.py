@@ -1,7 +1,10 @@
-import random
+import random, itertools
+import numpy as np
 from typing import List, Dict, Tuple
 from blockchain_simulator.blueprint import NodeBase, NetworkTopologyBase
 
+DELAY_SAMPLE_BATCH = 4096 # Link delays drawn per refill of the delay pool
+
 class SimpleRandomTopology(NetworkTopologyBase):
     def __init__(self, 
                  min_delay: float = 0.5,
@@ -10,49 +13,47 @@ class SimpleRandomTopology(NetworkTopologyBase):
         self.max_delay = max_delay
         self.min_delay = min_delay
         self.nodes = nodes
+        self.rng = np.random.default_rng(random.getrandbits(64))
+        self.delay_pool: List[float] = []
 
         if nodes:
             self.create_network_topology(nodes)
 
     def create_network_topology(self, nodes: List[NodeBase]) -> None:
         node_count = len(nodes)
-        connected_edges = set()
-        # Attempt random connections between each unique pair of nodes
-        for i in range(node_count):
-            for j in range(i + 1, node_count):
-                # Skip if already connected
-                if (i, j) in connected_edges or (j, i) in connected_edges:
-                    continue
-                
-                # Randomly decide to connect the two nodes
-                should_connect = random.random() < 0.3
-                if should_connect:
-                    node_a = nodes[i]
-                    node_b = nodes[j]
-                    node_a.add_peer(node_b)
-                    node_b.add_peer(node_a)
-                    connected_edges.add((i, j))
+        rng = self.rng
+        # Each unique pair once
+        for i in range(node_count - 1):
+            node_a = nodes[i]
+            for j in np.flatnonzero(rng.random(node_count - i - 1) < 0.3).tolist():
+                node_b = nodes[i + 1 + j]
+                node_a.add_peer(node_b)
+                node_b.add_peer(node_a)
     
         # Ensure no node is isolated
-        for node in nodes:
-            if not node.get_peers():
-                other_nodes = [n for n in nodes if n != node]
-                chosen_peer = random.choice(other_nodes)
+        for index, node in enumerate(nodes):
+            if not node.get_peers() and node_count > 1:
+                # Draw until it isn't this node
+                other = index
+                while other == index:
+                    other = int(rng.integers(node_count))
+                chosen_peer = nodes[other]
                 node.add_peer(chosen_peer)
                 chosen_peer.add_peer(node)
 
     def get_delay_between_nodes(self, node1: NodeBase, node2: NodeBase) -> float:
-        return random.uniform(self.min_delay, self.max_delay)
+        if not self.delay_pool:
+            self.delay_pool = self.rng.uniform(self.min_delay, self.max_delay, DELAY_SAMPLE_BATCH).tolist()
+        return self.delay_pool.pop()
     
 
 class FullyConnectedTopology(SimpleRandomTopology):
     
     def create_network_topology(self, node_list: List[NodeBase]) -> None:
         """Creates a fully connected network where every node is connected to every other node."""
-        for node in node_list:
-            for peer in node_list:
-                if node.node_id != peer.node_id:  # Don't connect to self
-                    node.add_peer(peer)
+        for node, peer in itertools.combinations(node_list, 2):
+            node.add_peer(peer)
+            peer.add_peer(node)
     
 
 class StarTopology(SimpleRandomTopology): 
@@ -3,6 +3,8 @@ from typing import List, Type, Dict, Set, Optional, Any
 import simpy
 
 class Node(NodeBase):
+    __slots__ = ("num_mined_blocks",)
+    
     def __init__(self, env: simpy.Environment, node_id: int, network: 'BlockchainSimulatorBase', 
                  consensus_protocol_class: Type['ConsensusProtocolBase'], blockchain_class: Type['BlockchainBase'], broadcast_protocol_class: Type['BroadcastProtocolBase'],  block_class: Type['BlockBase'], mining_difficulty: int = 0):\
                  
@@ -13,18 +15,28 @@ class Node(NodeBase):
         self.consensus.update_main_chain(self.blockchain, self.node_id) # Update the main chain
         
         # Create a new block
-        # Note: create_block returns a BlockBase which should work to assign new_block through the yield
-        new_block: BlockBase = yield self.env.process(self.block_class.create_block(self.blockchain.get_current_head(), self.env.now, self)) 
+        new_block: BlockBase = yield from self.block_class.create_block(self.blockchain.get_current_head(), self.env.now, self)
         if not self.is_mining or not self.blockchain.authorize_block(new_block, self):
             return
-        self.network.animator.log_event(f"Node {self.node_id} mined block {new_block.block_id}", timestamp=self.env.now)
+        if self.network.animator.enabled:
+            self.network.animator.log_event(f"Node {self.node_id} mined block {new_block.block_id}", timestamp=self.env.now)
         self.consensus.propose_block(self, new_block)
         self.num_mined_blocks += 1
     
     def step(self):
-        self.consensus.execute_consensus(self)
-        yield self.env.timeout(self.network.get_consensus_interval())
-        self.env.process(self.step())
+        env = self.env
+        interval = self.network.get_consensus_interval()
+        start = env.now # Consensus rounds fall on start + k * interval
+        while True:
+            if not self.proposed_blocks:
+                # Sleep until a block is proposed
+                self.proposal_event = env.event()
+                yield self.proposal_event
+                self.proposal_event = None
+                # Resume on the interval grid
+                yield env.timeout(interval - (env.now - start) % interval)
+            self.consensus.execute_consensus(self)
+            yield env.timeout(interval)
         
     def __repr__(self):
         return f"Node(node_id={self.node_id}, peers={len(self.peers)}, mining_difficulty={self.mining_difficulty}, blockchain={self.blockchain})"
\ No newline at end of file
@@ -1,10 +1,10 @@
 from blockchain_simulator.blueprint import BlockchainBase, BlockBase, NodeBase, ConsensusProtocolBase, BroadcastProtocolBase, BlockchainSimulatorBase, NetworkTopologyBase
 from typing import List, Type, Dict, Set, Optional
 import simpy, random, subprocess, math
+from operator import itemgetter
 from tqdm import tqdm
 
-#from blockchain_simulator.manim_animator import AnimationLogger
-from blockchain_simulator.examples.blockchain_simulator.manim_animator import AnimationLogger
+from blockchain_simulator.animation_logger import AnimationLogger
 
 class BlockchainSimulator(BlockchainSimulatorBase):
     def __init__(self, 
@@ -41,7 +41,7 @@ class BlockchainSimulator(BlockchainSimulatorBase):
         self.env = simpy.Environment()
         self.nodes: List[NodeBase] = self._create_nodes(consensus_protocol_class, blockchain_class, broadcast_protocol_class)
         self.network_topology: NetworkTopologyBase = network_topology_class(self.min_delay, self.max_delay, self.nodes)
-        self.animator = AnimationLogger()
+        self.animator = AnimationLogger(enabled=render_animation)
         self.input_pipe: Dict[int, simpy.Store] = {}
         self.request_backtrack: Dict[tuple[int, int], int] = {}  # (block_id, current_node) -> previous_node
         self.bandwidth: simpy.Resource = simpy.Resource(self.env, capacity=bandwidth)
@@ -104,7 +104,7 @@ class BlockchainSimulator(BlockchainSimulatorBase):
         if not heads:
             return 0.0
             
-        most_common_head, count = max(heads.items(), key=lambda x: x[1])
+        most_common_head, count = max(heads.items(), key=itemgetter(1))
         
         # Calculate the percentage of nodes with this head
         return most_common_head, count / len(self.nodes) * 100
@@ -116,12 +116,7 @@ class BlockchainSimulator(BlockchainSimulatorBase):
         """Collect metrics from the simulation."""
         total_orphans = 0
         for node in self.nodes:
-            main_chain = self.find_main_chain(node)
-            block_list = node.blockchain.blocks
-
-            for block_id in block_list:
-                if block_id not in main_chain:
-                    total_orphans += 1
+            total_orphans += len(node.blockchain.blocks) - len(self.find_main_chain(node))
         # Combine simulator and protocol metrics
         metrics = {
             "num_nodes": self.num_nodes,
@@ -164,27 +159,29 @@ class BlockchainSimulator(BlockchainSimulatorBase):
         
     def run(self, duration: float = 100):
         print(f"🚀 Running blockchain simulation for {duration} seconds...\n")
-        with tqdm(total=duration, desc="⏳ Simulation Progress", unit="s", ascii=" ▖▘▝▗▚▞█") as pbar:
-            last_time = self.env.now 
-            while self.env.now < duration:
-                self.env.step()
-                # Update pbar with the actual time that has passed
-                time_advanced = self.env.now - last_time
-                pbar.update(time_advanced)
-                last_time = self.env.now  # Update last_time to current time
+        with tqdm(total=duration, initial=self.env.now, desc="⏳ Simulation Progress", unit="s", ascii=" ▖▘▝▗▚▞█") as pbar:
+            if duration > self.env.now:
+                self.env.process(self._report_progress(pbar, duration, (duration - self.env.now) / 100))
+                self.env.run(until=duration)
+                pbar.update(duration - pbar.n)
             self._stop_mining()
         print("\n✅ Simulation complete!!")
         self.display_metrics()
         
         if self.render_animation:
             self.animator.set_num_nodes(self.num_nodes)
-            self.animator.set_peers({n.node_id: [p.node_id for p in n.peers] for n in self.nodes})
+            self.animator.set_peers({n.node_id: list(n.peers) for n in self.nodes})
             manim_file = "./blockchain_simulator/manim_animator.py"
             scene_class = "BlockchainAnimation"
             self.animator.save("animation_events.json")
             # run the subprocess to render the animation
             subprocess.run(["manim", "-pql", manim_file, scene_class, "-o", "network_activity.mp4"])        
 
+    def _report_progress(self, pbar: tqdm, until: float, interval: float):
+        """Advances the progress bar once per interval of simulated time until the run ends."""
+        while self.env.now + interval < until:
+            yield self.env.timeout(interval)
+            pbar.update(interval)
     
     def send_block_to_node(self, sender: NodeBase, recipient: NodeBase, block: BlockBase):
         if not self.set_bandwidth:
@@ -195,14 +192,31 @@ class BlockchainSimulator(BlockchainSimulatorBase):
         for _ in range(math.ceil(self.block_size / self.packet_size)):
             with self.bandwidth.request() as req:
                 yield req
-                # Log if bandwidth was contended for debugging purposes
-                if self.bandwidth.count >= self.bandwidth.capacity:
-                    print(f"\033[91m[Bandwidth Wait] Node {sender.node_id} waited for bandwidth at time {self.env.now}\033[0m")
-
                 yield self.env.timeout(self.network_topology.get_delay_between_nodes(sender, recipient))
         
         yield self.input_pipe[recipient.get_node_id()].put((block, sender))
     
+    def deliver_block(self, sender: NodeBase, recipient: NodeBase, block: BlockBase) -> None:
+        """Schedules a block delivery. Without bandwidth limits this is a single timeout callback instead of a process per message."""
+        if self.set_bandwidth:
+            self.env.process(self.send_block_to_node(sender, recipient, block))
+            return
+        delay = self.network_topology.get_delay_between_nodes(sender, recipient)
+        self.env.timeout(delay).callbacks.append(lambda _: recipient.broadcast_protocol.process_block(recipient, sender, block))
+    
+    def deliver_block_to_nodes(self, sender: NodeBase, recipients: List[NodeBase], block: BlockBase) -> None:
+        """Schedules a broadcast. With a fixed link delay the whole fan-out shares a single timeout."""
+        if self.set_bandwidth or self.min_delay != self.max_delay or not recipients:
+            super().deliver_block_to_nodes(sender, recipients, block)
+            return
+        delay = self.network_topology.get_delay_between_nodes(sender, recipients[0])
+        self.env.timeout(delay).callbacks.append(lambda _: self._receive_block(sender, recipients, block))
+    
+    def _receive_block(self, sender: NodeBase, recipients: List[NodeBase], block: BlockBase) -> None:
+        """Hands a delivered block straight to each recipient's broadcast protocol, skipping the input pipe and its consumer process."""
+        for recipient in recipients:
+            recipient.broadcast_protocol.process_block(recipient, sender, block)
+    
     def register_request_origin(self, block_id: int, current_node: NodeBase, origin_node: NodeBase):
         """Register the origin of the request for backtracking."""
         self.request_backtrack[(block_id, current_node.get_node_id())] = origin_node.get_node_id()
@@ -213,6 +227,13 @@ class BlockchainSimulator(BlockchainSimulatorBase):
         if node_id is not None:
             return self.nodes[node_id]
         return None
+    
+    def pop_request_origin(self, block_id: int, current_node: NodeBase) -> Optional[NodeBase]:
+        """Get the origin of the request for backtracking and remove it."""
+        node_id = self.request_backtrack.pop((block_id, current_node.get_node_id()), None)
+        if node_id is not None:
+            return self.nodes[node_id]
+        return None
             
     def _message_consumer(self, env: simpy.Environment, node: NodeBase):
         while True:
@@ -220,5 +241,4 @@ class BlockchainSimulator(BlockchainSimulatorBase):
             block, sender = yield self.input_pipe[node.get_node_id()].get()
             
             # Process message from the other block
-            node.broadcast_protocol.process_block(node, sender, block)
-            yield env.timeout(0)
\ No newline at end of file
+            node.broadcast_protocol.process_block(node, sender, block)
\ No newline at end of file
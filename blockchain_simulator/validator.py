@@ -4,6 +4,7 @@ Contains classes for validating the correctness of blockchain simulations.
 """
 
 from typing import Dict, Any, TYPE_CHECKING
+from operator import itemgetter
 
 if TYPE_CHECKING:
     from blockchain_simulator.simulator import BlockchainSimulator
@@ -144,7 +145,7 @@ class BlockchainValidator:
         
         # Calculate metrics
         total_heads = len(heads)
-        majority_head, majority_count = max(heads.items(), key=lambda x: x[1]) if heads else (None, 0)
+        majority_head, majority_count = max(heads.items(), key=itemgetter(1)) if heads else (None, 0)
         majority_percentage = majority_count / len(active_nodes)
         
         return {
@@ -214,7 +215,7 @@ class BlockchainValidator:
         if not heads:
             return 0.0
             
-        most_common_head, count = max(heads.items(), key=lambda x: x[1])
+        most_common_head, count = max(heads.items(), key=itemgetter(1))
         
         # Calculate the percentage of nodes with this head
         return most_common_head, count / len(active_nodes)
\ No newline at end of file
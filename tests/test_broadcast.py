@@ -0,0 +1,45 @@
+import unittest
+from blockchain_simulator import BlockchainSimulator, GHOSTProtocol, Blockchain, GossipProtocol, Node, PoWBlock, FullyConnectedTopology
+
+def make_simulator() -> BlockchainSimulator:
+    return BlockchainSimulator(network_topology_class=FullyConnectedTopology, consensus_protocol_class=GHOSTProtocol, blockchain_class=Blockchain,
+                               broadcast_protocol_class=GossipProtocol, node_class=Node, block_class=PoWBlock, num_nodes=3, mining_difficulty=0)
+
+def make_block(parent, miner) -> PoWBlock:
+    """Runs create_block to completion. Nothing is mined at difficulty 0, so it never yields."""
+    try:
+        next(PoWBlock.create_block(parent, 0.0, miner))
+    except StopIteration as done:
+        return done.value
+
+class TestProcessBlock(unittest.TestCase):
+    def test_orphan_is_added_once_parent_arrives(self):
+        sim = make_simulator()
+        node, sender = sim.nodes[0], sim.nodes[1]
+        parent = make_block(node.blockchain.get_genesis(), sender)
+        child = make_block(parent, sender)
+
+        node.broadcast_protocol.process_block(node, sender, child)
+        self.assertFalse(node.blockchain.contains_block(child.get_block_id()))
+
+        node.broadcast_protocol.process_block(node, sender, parent)
+        node.consensus.execute_consensus(node)
+        self.assertTrue(node.blockchain.contains_block(parent.get_block_id()))
+        self.assertTrue(node.blockchain.contains_block(child.get_block_id()))
+        self.assertEqual(node.blockchain.get_current_head().get_block_id(), child.get_block_id())
+
+    def test_request_response_is_forwarded_once(self):
+        sim = make_simulator()
+        node, sender, origin = sim.nodes
+        block = make_block(node.blockchain.get_genesis(), sender)
+        forwarded = []
+        sim.deliver_block = lambda frm, to, b: forwarded.append((frm.get_node_id(), to.get_node_id()))
+        sim.register_request_origin(block.get_block_id(), node, origin)
+
+        node.broadcast_protocol.process_block(node, sender, block)
+        node.broadcast_protocol.process_block(node, sender, block)
+        self.assertEqual(forwarded, [(node.get_node_id(), origin.get_node_id())])
+        self.assertIsNone(sim.get_request_origin(block.get_block_id(), node))
+
+if __name__ == "__main__":
+    unittest.main()
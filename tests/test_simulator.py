@@ -0,0 +1,22 @@
+import unittest, io, contextlib
+from blockchain_simulator import BlockchainSimulator, GHOSTProtocol, Blockchain, GossipProtocol, Node, PoWBlock, FullyConnectedTopology
+
+class TestRun(unittest.TestCase):
+    def test_run_twice(self):
+        # No miners, so idle nodes schedule nothing and only the progress reporter could be left on the queue
+        sim = BlockchainSimulator(network_topology_class=FullyConnectedTopology, consensus_protocol_class=GHOSTProtocol, blockchain_class=Blockchain,
+                                  broadcast_protocol_class=GossipProtocol, node_class=Node, block_class=PoWBlock, num_nodes=4, mining_difficulty=0)
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            sim.run(duration=2)
+            self.assertEqual(sim.env.now, 2)
+            sim.env.step() # env.run leaves its spent stop event on the queue
+            self.assertEqual(sim.env.peek(), float("inf"))
+            sim.run(duration=2) # Already at the end, so nothing happens
+            self.assertEqual(sim.env.now, 2)
+            sim.run(duration=3)
+            self.assertEqual(sim.env.now, 3)
+            sim.env.step() # env.run leaves its spent stop event on the queue
+            self.assertEqual(sim.env.peek(), float("inf"))
+
+if __name__ == "__main__":
+    unittest.main()